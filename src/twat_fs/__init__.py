@@ -5,12 +5,23 @@ twat-fs package - File system utilities for twat.
 """
 
 from importlib import metadata
+from typing import Any
 
 from twat_fs.cli import main, setup_provider, setup_providers, upload_file
-from twat_fs.upload import PROVIDERS_PREFERENCE, ProviderType
 
 __version__ = metadata.version(__name__)
 
+
+def __getattr__(name: str) -> Any:
+    """Load upload-module attributes on first use to keep CLI startup fast."""
+    if name in ("PROVIDERS_PREFERENCE", "ProviderType"):
+        from twat_fs import upload
+
+        return getattr(upload, name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
 __all__ = [
     "PROVIDERS_PREFERENCE",
     "ProviderType",
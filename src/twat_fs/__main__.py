@@ -1,7 +1,8 @@
 #!/usr/bin/env -S uv run
 # /// script
 # dependencies = [
-#   "fire",
+#   "loguru",
+#   "rich",
 # ]
 # ///
 # this_file: src/twat_fs/__main__.py
@@ -10,24 +11,24 @@
 Command-line interface for twat-fs package.
 
 Usage:
-    twat-fs upload FILE [--provider PROVIDER]
-    twat-fs setup provider PROVIDER
-    twat-fs setup all
+    twat-fs upload FILE [--provider PROVIDER]... [--unique] [--force] [--fragile]
+    twat-fs upload_provider status [PROVIDER] [--online]
+    twat-fs upload_provider list [--online]
 
 Commands:
-    upload      Upload a file using the specified provider
-    setup       Check provider setup and configuration
+    upload           Upload a file using the specified provider(s)
+    upload_provider  Check provider setup and configuration
 
 Examples:
     # Upload a file using default provider
     twat-fs upload path/to/file.txt
 
-    # Upload using specific provider
-    twat-fs upload path/to/file.txt --provider s3
+    # Upload using specific providers, in fallback order
+    twat-fs upload path/to/file.txt --provider s3 --provider catbox
 
     # Check provider setup
-    twat-fs setup provider s3
-    twat-fs setup all
+    twat-fs upload_provider status s3
+    twat-fs upload_provider list
 """
 
 from twat_fs.cli import main
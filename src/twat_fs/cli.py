@@ -1,6 +1,6 @@
 #!/usr/bin/env -S uv run
 # /// script
-# dependencies = ["fire", "loguru", "rich"]
+# dependencies = ["loguru", "rich"]
 # ///
 # this_file: src/twat_fs/cli.py
 
@@ -10,20 +10,15 @@ Command-line interface for twat-fs package.
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 from pathlib import Path
 
-import fire
 from loguru import logger
-from rich.console import Console
 
-from twat_fs.upload import (
-    PROVIDERS_PREFERENCE,
-    setup_provider as _setup_provider,
-    setup_providers as _setup_providers,
-    upload_file as _upload_file,
-)
+# twat_fs.upload, rich and the provider SDKs are imported inside the commands
+# that need them, so the CLI starts without loading every provider.
 
 # Configure logging: errors and warnings to stderr, provider info to stdout
 logger.remove()  # Remove default handler
@@ -66,6 +61,13 @@ class UploadProviderCommands:
             provider_id: Optional provider ID to show status info for.
             online: If True, run online tests to verify provider functionality.
         """
+        from rich.console import Console
+
+        from twat_fs.upload import (
+            setup_provider as _setup_provider,
+            setup_providers as _setup_providers,
+        )
+
         console = Console(stderr=True)  # Use stderr for error messages
 
         if provider_id:
@@ -167,6 +169,11 @@ class UploadProviderCommands:
             logger.remove()
             logger.add(sys.stderr, level="INFO", format="{message}")
 
+        from twat_fs.upload import (
+            PROVIDERS_PREFERENCE,
+            setup_provider as _setup_provider,
+        )
+
         active_providers = []
 
         for provider in PROVIDERS_PREFERENCE:
@@ -178,7 +185,7 @@ class UploadProviderCommands:
 
         # Print each active provider ID, one per line, to stdout
         for provider in active_providers:
-            pass
+            sys.stdout.write(f"{provider}\n")
 
         sys.exit(0)
 
@@ -198,7 +205,7 @@ class TwatFS:
     def upload(
         self,
         file_path: str | Path,
-        provider: str | list[str] = PROVIDERS_PREFERENCE,
+        provider: str | list[str] | None = None,
         unique: bool = False,
         force: bool = False,
         remote_path: str | None = None,
@@ -209,7 +216,8 @@ class TwatFS:
 
         Args:
             file_path: Path to the file to upload
-            provider: Provider(s) to use for upload. Can be a single provider or a list
+            provider: Provider(s) to use for upload. Can be a single provider or a list.
+                Defaults to all providers in order of preference
             unique: Add timestamp to filename to ensure uniqueness
             force: Overwrite existing files if they exist
             remote_path: Custom remote path/prefix (provider-specific)
@@ -218,6 +226,8 @@ class TwatFS:
         Returns:
             URL of the uploaded file
         """
+        from twat_fs.upload import upload_file as _upload_file
+
         try:
             # Handle provider list passed as string
             if isinstance(provider, str):
@@ -243,13 +253,107 @@ class TwatFS:
             sys.exit(1)
 
 
-def main() -> None:
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the CLI."""
+    parser = argparse.ArgumentParser(
+        prog="twat-fs",
+        description="Upload files using configured providers with automatic fallback.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    upload = commands.add_parser(
+        "upload",
+        aliases=["upload_file"],
+        help="Upload a file using configured providers",
+    )
+    upload.add_argument("file_path", help="Path to the file to upload")
+    upload.add_argument(
+        "--provider",
+        action="append",
+        help="Provider to use; repeat or separate with commas to set fallback order",
+    )
+    upload.add_argument(
+        "--unique",
+        action="store_true",
+        help="Add timestamp to filename to ensure uniqueness",
+    )
+    upload.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite existing files if they exist",
+    )
+    upload.add_argument(
+        "--remote-path",
+        "--remote_path",
+        dest="remote_path",
+        help="Custom remote path/prefix (provider-specific)",
+    )
+    upload.add_argument(
+        "--fragile",
+        action="store_true",
+        help="Fail immediately without trying fallback providers",
+    )
+    upload.set_defaults(handler=_cmd_upload)
+
+    providers = commands.add_parser(
+        "upload_provider", help="Manage upload providers (status, list)"
+    )
+    provider_commands = providers.add_subparsers(dest="action", required=True)
+
+    status = provider_commands.add_parser("status", help="Show provider setup status")
+    status.add_argument("provider_id", nargs="?", help="Provider to show status for")
+    status.add_argument(
+        "--online", action="store_true", help="Run online tests for providers"
+    )
+    status.set_defaults(handler=_cmd_provider_status)
+
+    ready = provider_commands.add_parser("list", help="List ready provider IDs")
+    ready.add_argument(
+        "--online", action="store_true", help="Run online tests for providers"
+    )
+    ready.set_defaults(handler=_cmd_provider_list)
+
+    return parser
+
+
+def _parse_providers(values: list[str] | None) -> list[str] | None:
+    """Flatten repeated and comma-separated --provider values."""
+    if not values:
+        return None
+    providers: list[str] = []
+    for value in values:
+        names = value.strip().removeprefix("[").removesuffix("]")
+        providers.extend(p.strip() for p in names.split(",") if p.strip())
+    return providers or None
+
+
+def _cmd_upload(args: argparse.Namespace) -> None:
+    """Handle the upload command."""
+    url = TwatFS().upload(
+        args.file_path,
+        provider=_parse_providers(args.provider),
+        unique=args.unique,
+        force=args.force,
+        remote_path=args.remote_path,
+        fragile=args.fragile,
+    )
+    sys.stdout.write(f"{url}\n")
+
+
+def _cmd_provider_status(args: argparse.Namespace) -> None:
+    """Handle the upload_provider status command."""
+    UploadProviderCommands().status(args.provider_id, online=args.online)
+
+
+def _cmd_provider_list(args: argparse.Namespace) -> None:
+    """Handle the upload_provider list command."""
+    UploadProviderCommands().list(online=args.online)
+
+
+def main(argv: list[str] | None = None) -> None:
     """Entry point for the CLI."""
-    if __name__ == "__main__":
-        fire.Fire(TwatFS)
-    else:
-        # When imported as a module
-        fire.Fire(TwatFS())
+    args = _build_parser().parse_args(argv)
+    args.handler(args)
 
 
 # Backwards compatibility for the API
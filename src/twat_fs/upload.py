@@ -638,7 +638,7 @@ def upload_file(
     if provider:
         providers = [provider] if isinstance(provider, str) else list(provider)
     else:
-        providers = PROVIDERS_PREFERENCE
+        providers = list(PROVIDERS_PREFERENCE)
 
     # Validate providers
     if not providers:
@@ -18,8 +18,9 @@ from twat_fs.upload_providers.types import ExpirationTime, UploadResult
 if TYPE_CHECKING:
     from pathlib import Path
 
-# List of available providers in order of preference
-PROVIDERS_PREFERENCE = [
+# Names of available providers in order of preference. Provider modules are
+# only imported by get_provider_module() when a provider is actually used.
+PROVIDERS_PREFERENCE = (
     "litterbox",
     "bashupload",
     "www0x0",
@@ -29,7 +30,7 @@ PROVIDERS_PREFERENCE = [
     "dropbox",
     "catbox",
     "filebin",
-]
+)
 
 __all__ = [
     "PROVIDERS_PREFERENCE",
@@ -7,7 +7,13 @@ Supports authenticated uploads to Dropbox.
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import hashlib
 import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
@@ -16,17 +22,17 @@ from twat_fs.upload_providers.core import (
 )
 
 
-from datetime import datetime, timezone
 from typing import TypedDict, TYPE_CHECKING
-from urllib import parse
 
 import dropbox  # type: ignore
+import requests
 from dropbox.exceptions import AuthError
 from dotenv import load_dotenv
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from twat_fs.upload_providers.types import UploadResult
 
 # Provider-specific help messages
@@ -54,7 +60,21 @@ load_dotenv()
 # Constants
 DEFAULT_UPLOAD_PATH = "/upload"
 MAX_FILE_SIZE = 150 * 1024 * 1024  # 150MB
-SMALL_FILE_THRESHOLD = 4 * 1024 * 1024  # 4MB threshold for chunked upload
+CHUNK_SIZE = 16 * 1024 * 1024  # 16MB per upload session request
+# Anything that fits in one chunk goes in a single files_upload call
+SMALL_FILE_THRESHOLD = CHUNK_SIZE
+MAX_PARALLEL_UPLOADS = 8  # Well below Dropbox's API rate limits
+CONNECTION_POOL_SIZE = 32  # Connections kept alive per Dropbox host
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024  # Block size of Dropbox content_hash
+SHARE_URL_ATTEMPTS = 3  # Tries to get a share URL before giving up
+SHARE_URL_RETRY_WAIT = 4  # Seconds before the first retry, doubled each time
+SHARE_URL_MAX_WAIT = 10  # Upper bound in seconds on a single retry wait
+DIRECTORY_CACHE_TTL = 300  # Seconds to trust a verified upload directory
+
+# (access token, upload path) -> time.monotonic() of the last successful check
+_verified_dirs: dict[tuple[str, str], float] = {}
+# (access token, Dropbox path) -> direct download URL
+_share_url_cache: dict[tuple[str, str], str] = {}
 
 
 class DropboxCredentials(TypedDict):
@@ -76,10 +96,10 @@ class DropboxClient:
 
     def _create_client(self) -> dropbox.Dropbox:
         """Create and return a Dropbox client instance."""
-        return dropbox.Dropbox(
-            oauth2_access_token=self.credentials["access_token"],
-            oauth2_refresh_token=self.credentials["refresh_token"],
-            app_key=self.credentials["app_key"],
+        return _get_client(
+            self.credentials["access_token"],
+            self.credentials["refresh_token"],
+            self.credentials["app_key"],
         )
 
     def _refresh_token_if_needed(self) -> None:
@@ -116,14 +136,8 @@ class DropboxClient:
         """Upload a file to Dropbox and return its URL."""
         logger.debug(f"Starting upload process for {file_path}")
 
-        path = Path(file_path)
-        if not path.exists():
-            msg = f"File {path} does not exist"
-            raise FileNotFoundError(msg)
-
-        if not os.access(path, os.R_OK):
-            msg = f"File {path} cannot be read"
-            raise PermissionError(msg)
+        path = file_path if isinstance(file_path, Path) else Path(file_path)
+        file_size = _validate_file(path).st_size
 
         try:
             # Check and refresh token if needed
@@ -137,7 +151,7 @@ class DropboxClient:
 
             # Add timestamp for unique filenames
             if unique:
-                timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+                timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
                 name, ext = os.path.splitext(remote_path)
                 remote_path = f"{name}_{timestamp}{ext}"
 
@@ -146,23 +160,56 @@ class DropboxClient:
             logger.debug(f"Target Dropbox path: {db_path}")
 
             # Ensure upload directory exists
-            _ensure_upload_directory(self.dbx, upload_path)
+            token = self.credentials["access_token"]
+            _ensure_upload_directory(self.dbx, upload_path, token)
 
             # Check if file exists
-            exists, remote_metadata = _check_file_exists(self.dbx, db_path)
-            if exists and not force:
-                msg = f"File already exists at {db_path}"
-                raise DropboxFileExistsError(msg)
+            unchanged = False
+            if force:
+                exists, remote_metadata = _check_file_exists(self.dbx, db_path)
+                # Overwriting with identical content is wasted traffic
+                unchanged = (
+                    remote_metadata is not None
+                    and remote_metadata["size"] == file_size
+                    and remote_metadata["content_hash"] == _dropbox_content_hash(path)
+                )
+                if not unchanged:
+                    _share_url_cache.pop((token, db_path), None)
+            elif unique:
+                # Timestamped paths almost never exist, so don't look for a link
+                exists, remote_metadata = _check_file_exists(self.dbx, db_path)
+                if exists:
+                    msg = f"File already exists at {db_path}"
+                    raise DropboxFileExistsError(msg)
+            else:
+                # Look up any existing share link alongside the metadata, so
+                # reporting an existing file costs one round-trip, not two
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    exists_future = executor.submit(
+                        _check_file_exists, self.dbx, db_path
+                    )
+                    url_future = executor.submit(_existing_share_url, self.dbx, db_path)
+                    exists, remote_metadata = exists_future.result()
+                if exists:
+                    existing_url = (
+                        None if url_future.exception() else url_future.result()
+                    )
+                    if existing_url:
+                        _share_url_cache[(token, db_path)] = existing_url
+                    msg = f"File already exists at {db_path}"
+                    raise DropboxFileExistsError(msg, url=existing_url)
 
             # Upload file based on size
-            file_size = os.path.getsize(path)
-            if file_size <= SMALL_FILE_THRESHOLD:
+            if unchanged:
+                logger.debug(f"Remote file is identical, skipping upload: {db_path}")
+            elif file_size <= SMALL_FILE_THRESHOLD:
                 _upload_small_file(self.dbx, path, db_path)
             else:
-                _upload_large_file(self.dbx, path, db_path, SMALL_FILE_THRESHOLD)
+                _upload_large_file(self.dbx, path, db_path, CHUNK_SIZE, file_size)
 
             # Get shareable URL
-            url = _get_share_url(self.dbx, db_path)
+            # A path that was missing above is known to have no link yet
+            url = _get_share_url(self.dbx, db_path, token, existed=exists)
             if not url:
                 msg = "Failed to get share URL"
                 raise DropboxUploadError(msg)
@@ -173,6 +220,8 @@ class DropboxClient:
         except DropboxFileExistsError:
             raise
         except Exception as e:
+            # The directory may have been removed since it was verified
+            _verified_dirs.pop((self.credentials["access_token"], upload_path), None)
             logger.error(f"Failed to upload to Dropbox: {e}")
             msg = f"Upload failed: {e}"
             raise DropboxUploadError(msg) from e
@@ -284,6 +333,8 @@ def upload_file(
             f"File already exists in Dropbox. Use --force to overwrite, "
             f"or use --unique to create a unique filename. Error: {e}"
         )
+        if e.url:
+            msg = f"{msg}. Existing file: {e.url}"
         raise ValueError(msg) from e
     except DropboxUploadError as e:
         if "expired_access_token" in str(e):
@@ -296,6 +347,42 @@ def upload_file(
         raise ValueError(msg) from e
 
 
+def upload_files(
+    file_paths: Sequence[str | Path],
+    *,
+    max_workers: int = MAX_PARALLEL_UPLOADS,
+    **kwargs: Any,
+) -> list[UploadResult]:
+    """
+    Upload several files to Dropbox concurrently.
+
+    Args:
+        file_paths: Paths of the files to upload
+        max_workers: Maximum number of uploads in flight at once
+        **kwargs: Options passed through to upload_file for every file
+
+    Returns:
+        list[UploadResult]: Upload results, in the same order as file_paths
+
+    Raises:
+        ValueError: If any upload fails; uploads not yet started are cancelled
+    """
+    results: dict[int, UploadResult] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(upload_file, path, **kwargs): i
+            for i, path in enumerate(file_paths)
+        }
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except Exception:
+            # Don't start the rest of the batch once one upload has failed
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return [results[i] for i in range(len(file_paths))]
+
+
 class DropboxUploadError(Exception):
     """Base class for Dropbox upload errors."""
 
@@ -316,29 +403,37 @@ class FolderExistsError(PathConflictError):
     """Raised when a folder exists where a file should be uploaded."""
 
 
-def _validate_file(local_path: Path) -> None:
+def _validate_file(local_path: Path) -> os.stat_result:
     """
     Validate file exists and can be read.
 
     Args:
         local_path: Path to the file to validate
 
+    Returns:
+        os.stat_result: Result of the single stat call, for reuse by the caller
+
     Raises:
         FileNotFoundError: If file does not exist
+        ValueError: If path is not a regular file
         PermissionError: If file cannot be read
     """
-    if not get_provider():
-        msg = "DROPBOX_ACCESS_TOKEN environment variable must be set"
-        raise ValueError(msg)
-
-    if not local_path.exists():
+    try:
+        st = local_path.stat()
+    except FileNotFoundError:
         msg = f"File {local_path} does not exist"
-        raise FileNotFoundError(msg)
+        raise FileNotFoundError(msg) from None
+
+    if not stat.S_ISREG(st.st_mode):
+        msg = f"Not a file: {local_path}"
+        raise ValueError(msg)
 
     if not os.access(local_path, os.R_OK):
         msg = f"File {local_path} cannot be read"
         raise PermissionError(msg)
 
+    return st
+
 
 def _get_download_url(url: str) -> str | None:
     """
@@ -351,28 +446,100 @@ def _get_download_url(url: str) -> str | None:
     Returns:
         str | None: Direct download URL if successful, None otherwise
     """
-    try:
-        parsed = parse.urlparse(url)
-        # Get existing query parameters
-        query = dict(parse.parse_qsl(parsed.query))
-        # Add or update dl parameter
-        query["dl"] = "1"
-        # Reconstruct URL with updated query
-        return parsed._replace(
-            netloc="dl.dropboxusercontent.com", query=parse.urlencode(query)
-        ).geturl()
-    except Exception as e:
-        logger.error(f"Failed to generate download URL: {e}")
+    if not url:
         return None
 
+    # Swap the host for the direct-download one
+    scheme, sep, rest = url.partition("://")
+    _, slash, path = rest.partition("/")
+    return _with_dl1(f"{scheme}{sep}dl.dropboxusercontent.com{slash}{path}")
+
+
+def _with_dl1(url: str) -> str:
+    """
+    Set the dl parameter of a Dropbox URL to 1, keeping any other parameters.
+
+    Args:
+        url: The Dropbox URL to convert
+
+    Returns:
+        str: The URL with dl=1 as its last query parameter
+    """
+    # Share links from the SDK always end in dl=0, with or without other
+    # parameters (such as rlkey) before it, so this covers nearly every call
+    if url.endswith(("?dl=0", "&dl=0")):
+        return url[:-1] + "1"
+
+    base, _, query = url.partition("?")
+    params = [p for p in query.split("&") if p and not p.startswith("dl=")]
+    params.append("dl=1")
+    return f"{base}?{'&'.join(params)}"
+
+
+def _existing_share_url(dbx: dropbox.Dropbox, db_path: str) -> str | None:
+    """
+    Get the direct download URL of an existing share link, if there is one.
+
+    Args:
+        dbx: Dropbox client instance
+        db_path: Path to the file in Dropbox
+
+    Returns:
+        str | None: Direct download URL, or None if the file is not shared
+    """
+    links = dbx.sharing_list_shared_links(path=db_path, direct_only=True).links
+    if not links:
+        return None
+    return _with_dl1(str(links[0].url))
+
+
+def _create_share_url(dbx: dropbox.Dropbox, db_path: str) -> str:
+    """
+    Create a share link for a file, or fetch the one it already has.
+
+    Args:
+        dbx: Dropbox client instance
+        db_path: Path to the file in Dropbox
+
+    Returns:
+        str: Direct download URL for the file
+    """
+    try:
+        shared_link = dbx.sharing_create_shared_link_with_settings(db_path)
+    except dropbox.exceptions.ApiError as e:
+        is_taken = getattr(e.error, "is_shared_link_already_exists", None)
+        if not (callable(is_taken) and is_taken()):
+            raise
+        # The error usually carries the existing link, but it is optional
+        existing = e.error.get_shared_link_already_exists()
+        if existing is not None and existing.is_metadata():
+            shared_link = existing.get_metadata()
+        elif existing_url := _existing_share_url(dbx, db_path):
+            return existing_url
+        else:
+            raise
+    return _with_dl1(str(shared_link.url))
+
 
-def _get_share_url(dbx: dropbox.Dropbox, db_path: str) -> str:
+def _get_share_url(
+    dbx: dropbox.Dropbox,
+    db_path: str,
+    token: str | None = None,
+    *,
+    existed: bool = False,
+) -> str:
     """
     Get a shareable URL for a file in Dropbox.
 
+    Existing links, cached or not, are only looked up for paths that existed
+    before the upload; a fresh file goes straight to link creation. URLs are
+    remembered per access token and path.
+
     Args:
         dbx: Dropbox client instance
         db_path: Path to the file in Dropbox
+        token: Access token used to key the cache; no caching if omitted
+        existed: Whether the path existed before the upload
 
     Returns:
         str: Direct download URL for the file
@@ -380,46 +547,80 @@ def _get_share_url(dbx: dropbox.Dropbox, db_path: str) -> str:
     Raises:
         DropboxUploadError: If URL creation fails
     """
+    key = (token, db_path) if token else None
+    # A cached link for a path that was missing belongs to a deleted file
+    if key and existed and (cached := _share_url_cache.get(key)):
+        logger.debug(f"Using cached share URL: {cached}")
+        return cached
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-    )
-    def get_url() -> str:
+    for attempt in range(SHARE_URL_ATTEMPTS):
         try:
-            shared_link = dbx.sharing_create_shared_link_with_settings(db_path)
-            # Convert to direct download URL
-            url = str(shared_link.url).replace("?dl=0", "?dl=1")
-            logger.debug(f"Created share URL: {url}")
-            return url
+            existing_url = _existing_share_url(dbx, db_path) if existed else None
+            if existing_url:
+                logger.debug(f"Found existing share URL: {existing_url}")
+                url = existing_url
+            else:
+                url = _create_share_url(dbx, db_path)
+                logger.debug(f"Created share URL: {url}")
+            break
         except Exception as e:
-            logger.error(f"Failed to create share URL: {e}")
-            raise
+            if attempt == SHARE_URL_ATTEMPTS - 1 or not _is_retryable(e):
+                logger.error(f"Failed to create share URL: {e}")
+                msg = f"Failed to create share URL: {e}"
+                raise DropboxUploadError(msg) from e
+            wait = min(SHARE_URL_RETRY_WAIT * 2**attempt, SHARE_URL_MAX_WAIT)
+            logger.warning(f"Failed to create share URL, retrying in {wait}s: {e}")
+            time.sleep(wait)
 
-    try:
-        url = get_url()
-        if not isinstance(url, str):
-            msg = f"Expected string URL but got {type(url)}"
-            raise DropboxUploadError(msg)
-        return url
-    except Exception as e:
-        msg = f"Failed to create share URL: {e}"
-        raise DropboxUploadError(msg) from e
+    if key:
+        _share_url_cache[key] = url
+    return url
+
+
+def _is_retryable(e: Exception) -> bool:
+    """
+    Check whether a failed Dropbox call is worth retrying.
+
+    Only network failures are retried here. The SDK client already retries
+    server errors and rate limits itself, and API errors are route errors
+    that will fail the same way again, as will authentication and bad input
+    errors.
+
+    Args:
+        e: The exception raised by the Dropbox SDK
+
+    Returns:
+        bool: True if the call should be retried
+    """
+    return isinstance(e, requests.exceptions.RequestException)
 
 
-def _ensure_upload_directory(dbx: Any, upload_path: str) -> None:
+def _ensure_upload_directory(
+    dbx: Any, upload_path: str, token: str | None = None
+) -> None:
     """
     Ensure the upload directory exists.
 
+    Directories verified for a given access token are remembered for
+    DIRECTORY_CACHE_TTL seconds, so batches of uploads to the same path skip
+    the round-trip.
+
     Args:
         dbx: Dropbox client
         upload_path: Path to ensure exists
+        token: Access token used to key the cache; no caching if omitted
 
     Raises:
         DropboxUploadError: If directory cannot be created
     """
     import dropbox
 
+    key = (token, upload_path) if token else None
+    verified_at = _verified_dirs.get(key) if key else None
+    if verified_at is not None and time.monotonic() - verified_at < DIRECTORY_CACHE_TTL:
+        logger.debug(f"Upload directory recently verified: {upload_path}")
+        return
+
     logger.debug(f"Ensuring upload directory exists: {upload_path}")
 
     try:
@@ -435,10 +636,12 @@ def _ensure_upload_directory(dbx: Any, upload_path: str) -> None:
                 and e.error.get_path().is_conflict()
             ):
                 logger.debug(f"Directory already exists: {upload_path}")
-                return
-            # For other API errors, raise
-            logger.error(f"Failed to create directory: {e}")
-            raise
+            else:
+                # For other API errors, raise
+                logger.error(f"Failed to create directory: {e}")
+                raise
+        if key:
+            _verified_dirs[key] = time.monotonic()
     except Exception as e:
         msg = f"Failed to create upload directory: {e}"
         raise DropboxUploadError(msg) from e
@@ -463,6 +666,7 @@ def _get_file_metadata(dbx: Any, db_path: str) -> dict | None:
             "size": metadata.size,
             "path": metadata.path_display,
             "id": metadata.id,
+            "content_hash": getattr(metadata, "content_hash", None),
         }
     except dropbox.exceptions.ApiError as e:
         if e.error.is_path() and e.error.get_path().is_not_found():
@@ -470,6 +674,28 @@ def _get_file_metadata(dbx: Any, db_path: str) -> dict | None:
         raise
 
 
+def _dropbox_content_hash(file_path: Path) -> str:
+    """
+    Compute a local file's hash the way Dropbox computes content_hash.
+
+    The file is split into 4MB blocks, each block is hashed with SHA-256, and
+    the concatenated block digests are hashed again.
+
+    Args:
+        file_path: Path to the local file
+
+    Returns:
+        str: Hex digest comparable to FileMetadata.content_hash
+    """
+    overall = hashlib.sha256()
+    block = bytearray(CONTENT_HASH_BLOCK_SIZE)
+    view = memoryview(block)
+    with open(file_path, "rb", buffering=0) as f:
+        while n := f.readinto(block):
+            overall.update(hashlib.sha256(view[:n]).digest())
+    return overall.hexdigest()
+
+
 def _check_file_exists(dbx: Any, db_path: str) -> tuple[bool, dict | None]:
     """
     Check if a file exists in Dropbox and return its metadata.
@@ -506,34 +732,79 @@ def _upload_small_file(dbx: dropbox.Dropbox, file_path: Path, db_path: str) -> N
 
 
 def _upload_large_file(
-    dbx: dropbox.Dropbox, file_path: Path, db_path: str, chunk_size: int
+    dbx: dropbox.Dropbox,
+    file_path: Path,
+    db_path: str,
+    chunk_size: int,
+    file_size: int | None = None,
 ) -> None:
-    """Upload a large file to Dropbox using chunked upload."""
+    """
+    Upload a large file to Dropbox using chunked upload.
+
+    Dropbox requires session appends to arrive in offset order, so chunks are
+    still sent one at a time, but the next chunk is read from disk in a
+    background thread while the current one is in flight.
+
+    Chunks are plain bytes from f.read(): the SDK rejects bytearray and
+    memoryview bodies, and requests sends bytes without copying them, so each
+    chunk is allocated exactly once and at most two are alive at a time.
+    """
     logger.debug(f"Starting chunked upload: {file_path} -> {db_path}")
-    file_size = os.path.getsize(file_path)
+    if file_size is None:
+        file_size = os.path.getsize(file_path)
     try:
-        with open(file_path, "rb") as f:
-            upload_session_start_result = dbx.files_upload_session_start(
-                f.read(chunk_size)
-            )
+        with (
+            open(file_path, "rb") as f,
+            ThreadPoolExecutor(max_workers=1) as reader,
+        ):
+            # Ask the kernel for aggressive readahead, so reads issued by the
+            # reader thread are mostly served from the page cache
+            if hasattr(os, "posix_fadvise"):
+                with contextlib.suppress(OSError):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            chunk = f.read(chunk_size)
+            upload_session_start_result = dbx.files_upload_session_start(chunk)
             logger.debug("Upload session started")
 
+            # Track the offset ourselves: f.tell() is meaningless while the
+            # reader thread is already consuming the next chunk.
+            offset = len(chunk)
             cursor = dropbox.files.UploadSessionCursor(
                 session_id=upload_session_start_result.session_id,
-                offset=f.tell(),
+                offset=offset,
             )
             commit = dropbox.files.CommitInfo(
                 path=db_path, mode=dropbox.files.WriteMode.overwrite
             )
 
-            while f.tell() < file_size:
-                if (file_size - f.tell()) <= chunk_size:
+            if offset >= file_size:
+                dbx.files_upload_session_finish(b"", cursor, commit)
+            else:
+                next_chunk = reader.submit(f.read, chunk_size)
+
+            # Report progress in 10% steps rather than per chunk, using
+            # integer byte thresholds so the loop does no float math
+            next_log_offset = file_size // 10
+            while offset < file_size:
+                chunk = next_chunk.result()
+                if not chunk:
+                    msg = f"File {file_path} was truncated during upload"
+                    raise DropboxUploadError(msg)
+                offset += len(chunk)
+
+                if offset >= file_size:
                     logger.debug("Uploading final chunk")
-                    dbx.files_upload_session_finish(f.read(chunk_size), cursor, commit)
+                    dbx.files_upload_session_finish(chunk, cursor, commit)
                 else:
-                    logger.debug(f"Uploading chunk at offset {cursor.offset}")
-                    dbx.files_upload_session_append_v2(f.read(chunk_size), cursor)
-                    cursor.offset = f.tell()
+                    next_chunk = reader.submit(f.read, chunk_size)
+                    dbx.files_upload_session_append_v2(chunk, cursor)
+                    cursor.offset = offset
+
+                    if offset >= next_log_offset:
+                        progress = offset * 100 // file_size
+                        logger.debug(f"Uploaded {progress}% of {db_path}")
+                        next_log_offset = (progress // 10 + 1) * file_size // 10
 
         logger.debug(f"Successfully uploaded large file: {db_path}")
     except Exception as e:
@@ -606,9 +877,34 @@ def _validate_credentials(credentials: DropboxCredentials) -> None:
     # ... existing code ...
 
 
-def _get_client(credentials: DropboxCredentials) -> Any:
-    """Get Dropbox client instance."""
-    # ... existing code ...
+@functools.cache
+def _get_session() -> Any:
+    """
+    Get the HTTP session shared by all Dropbox clients.
+
+    Uses the SDK's certificate-pinned session, with a connection pool large
+    enough for parallel uploads so connections are reused rather than
+    discarded and re-handshaken when the default pool overflows.
+    """
+    return dropbox.create_session(max_connections=CONNECTION_POOL_SIZE)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(
+    access_token: str, refresh_token: str | None = None, app_key: str | None = None
+) -> dropbox.Dropbox:
+    """
+    Get a Dropbox client instance, reusing one per set of credentials.
+
+    Clients share one connection pool, so HTTPS connections stay alive across
+    uploads instead of paying a new TLS handshake per file.
+    """
+    return dropbox.Dropbox(
+        oauth2_access_token=access_token,
+        oauth2_refresh_token=refresh_token,
+        app_key=app_key,
+        session=_get_session(),
+    )
 
 
 def _refresh_token(credentials: DropboxCredentials) -> DropboxCredentials | None:
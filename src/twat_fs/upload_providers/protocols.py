@@ -6,7 +6,7 @@ Protocol definitions for upload providers.
 
 from __future__ import annotations
 
-from typing import Any, ClassVar, Protocol, TypedDict, runtime_checkable, TypeVar
+from typing import Any, ClassVar, Protocol, TypedDict, TypeVar
 from collections.abc import Awaitable, Coroutine
 from pathlib import Path
 
@@ -24,9 +24,13 @@ class ProviderHelp(TypedDict):
     deps: str
 
 
-@runtime_checkable
 class ProviderClient(Protocol):
-    """Protocol defining the interface for upload providers."""
+    """
+    Protocol defining the interface for upload providers.
+
+    Used for static checking only; runtime code checks for the attributes it
+    needs instead of calling isinstance().
+    """
 
     provider_name: str
 
@@ -57,7 +61,6 @@ class ProviderClient(Protocol):
         ...
 
 
-@runtime_checkable
 class Provider(Protocol):
     """Protocol defining what a provider module must implement."""
 
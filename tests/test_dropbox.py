@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+# this_file: tests/test_dropbox.py
+
+"""
+Tests for Dropbox provider internals.
+Tests chunked uploads without talking to the Dropbox API.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from dropbox.exceptions import ApiError, InternalServerError
+from dropbox.sharing import (
+    CreateSharedLinkWithSettingsError,
+    SharedLinkAlreadyExistsMetadata,
+    SharedLinkMetadata,
+)
+from loguru import logger
+
+from twat_fs.upload_providers import dropbox
+
+CHUNK = 1024
+
+
+@pytest.fixture
+def mock_dbx() -> MagicMock:
+    """Dropbox client that records session calls."""
+    dbx = MagicMock()
+    dbx.files_upload_session_start.return_value.session_id = "session"
+    return dbx
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> dropbox.DropboxClient:
+    """DropboxClient backed by a mock API client, with empty caches."""
+    monkeypatch.setattr(dropbox, "_verified_dirs", {})
+    monkeypatch.setattr(dropbox, "_share_url_cache", {})
+    client = dropbox.DropboxClient(
+        {
+            "access_token": "token",
+            "refresh_token": None,
+            "app_key": None,
+            "app_secret": None,
+        }
+    )
+    client.dbx = MagicMock()
+    return client
+
+
+class TestLargeFileUpload:
+    """Test chunked session uploads."""
+
+    @pytest.mark.parametrize("size", [CHUNK * 3, CHUNK * 3 + 17, CHUNK])
+    def test_chunks_are_sent_in_order(
+        self, tmp_path: Path, mock_dbx: MagicMock, size: int
+    ) -> None:
+        """Test that every byte is sent once, at the right offset."""
+        data = bytes(i % 251 for i in range(size))
+        path = tmp_path / "large.bin"
+        path.write_bytes(data)
+        offsets: list[int] = []
+        mock_dbx.files_upload_session_append_v2.side_effect = lambda chunk, cursor: (
+            offsets.append(cursor.offset)
+        )
+
+        dropbox._upload_large_file(mock_dbx, path, "/upload/large.bin", CHUNK)
+
+        sent = [mock_dbx.files_upload_session_start.call_args.args[0]]
+        sent += [
+            c.args[0] for c in mock_dbx.files_upload_session_append_v2.call_args_list
+        ]
+        finish = mock_dbx.files_upload_session_finish.call_args
+        sent.append(finish.args[0])
+        assert all(type(chunk) is bytes for chunk in sent)
+        assert b"".join(sent) == data
+        assert offsets == [CHUNK * i for i in range(1, len(offsets) + 1)]
+        assert finish.args[1].offset == size - len(finish.args[0])
+
+    def test_append_failure_is_wrapped(
+        self, tmp_path: Path, mock_dbx: MagicMock
+    ) -> None:
+        """Test that API errors surface as DropboxUploadError."""
+        path = tmp_path / "large.bin"
+        path.write_bytes(b"x" * CHUNK * 4)
+        mock_dbx.files_upload_session_append_v2.side_effect = RuntimeError("boom")
+
+        with pytest.raises(dropbox.DropboxUploadError, match="boom"):
+            dropbox._upload_large_file(mock_dbx, path, "/upload/large.bin", CHUNK)
+
+
+class TestClientReuse:
+    """Test client caching and batch uploads."""
+
+    def test_client_is_cached_per_token(self) -> None:
+        """Test that the same credentials share one Dropbox client."""
+        dropbox._get_client.cache_clear()
+        try:
+            first = dropbox._get_client("token-a")
+            assert dropbox._get_client("token-a") is first
+            assert dropbox._get_client("token-b") is not first
+            assert dropbox._get_client("token-b")._session is first._session
+        finally:
+            dropbox._get_client.cache_clear()
+
+    def test_upload_files_preserves_order(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that batch results line up with the input paths."""
+        calls: list[tuple[str, bool]] = []
+
+        def fake_upload(path: str, *, force: bool = False) -> str:
+            calls.append((path, force))
+            return f"https://example.com/{path}"
+
+        monkeypatch.setattr(dropbox, "upload_file", fake_upload)
+        paths = [f"file{i}.txt" for i in range(20)]
+
+        results = dropbox.upload_files(paths, force=True)
+
+        assert results == [f"https://example.com/{p}" for p in paths]
+        assert sorted(calls) == sorted((p, True) for p in paths)
+
+    def test_upload_files_stops_after_failure(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that queued uploads are cancelled once one upload fails."""
+        calls: list[str] = []
+        cancelled = threading.Event()
+
+        class Executor(ThreadPoolExecutor):
+            def shutdown(self, *args: Any, **kwargs: Any) -> None:
+                super().shutdown(*args, **kwargs)
+                if kwargs.get("cancel_futures"):
+                    cancelled.set()
+
+        def fake_upload(path: str) -> str:
+            calls.append(path)
+            if path == "bad.txt":
+                msg = "Upload failed"
+                raise ValueError(msg)
+            # Hold the worker until the queue has been cancelled; if that never
+            # happens, let the rest run so the assertion below fails
+            if not cancelled.wait(timeout=5):
+                cancelled.set()
+            return f"https://example.com/{path}"
+
+        monkeypatch.setattr(dropbox, "ThreadPoolExecutor", Executor)
+        monkeypatch.setattr(dropbox, "upload_file", fake_upload)
+        paths = ["bad.txt"] + [f"file{i}.txt" for i in range(100)]
+
+        with pytest.raises(ValueError, match="Upload failed"):
+            dropbox.upload_files(paths, max_workers=1)
+
+        # The single worker may pick up one more file before cancellation
+        assert calls[0] == "bad.txt"
+        assert len(calls) <= 2
+
+
+class TestUploadDirectoryCache:
+    """Test caching of verified upload directories."""
+
+    def test_directory_checked_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that repeated checks within the TTL skip the API call."""
+        monkeypatch.setattr(dropbox, "_verified_dirs", {})
+        dbx = MagicMock()
+
+        dropbox._ensure_upload_directory(dbx, "/upload", "token")
+        dropbox._ensure_upload_directory(dbx, "/upload", "token")
+        dropbox._ensure_upload_directory(dbx, "/other", "token")
+
+        assert dbx.files_create_folder_v2.call_count == 2
+
+    def test_directory_rechecked_after_ttl(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that expired entries trigger a new check."""
+        monkeypatch.setattr(dropbox, "_verified_dirs", {("token", "/upload"): 0.0})
+        monkeypatch.setattr(dropbox.time, "monotonic", lambda: 1000.0)
+        dbx = MagicMock()
+
+        dropbox._ensure_upload_directory(dbx, "/upload", "token")
+
+        dbx.files_create_folder_v2.assert_called_once_with("/upload")
+        assert dropbox._verified_dirs[("token", "/upload")] == 1000.0
+
+
+class TestDownloadUrl:
+    """Test share URL to direct download URL conversion."""
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            (
+                "https://www.dropbox.com/s/abc/file.txt?dl=0",
+                "https://dl.dropboxusercontent.com/s/abc/file.txt?dl=1",
+            ),
+            (
+                "https://www.dropbox.com/s/abc/file.txt",
+                "https://dl.dropboxusercontent.com/s/abc/file.txt?dl=1",
+            ),
+            (
+                "https://www.dropbox.com/scl/fi/abc/file.txt?rlkey=xyz&dl=0",
+                "https://dl.dropboxusercontent.com/scl/fi/abc/file.txt?rlkey=xyz&dl=1",
+            ),
+            (
+                "https://www.dropbox.com/scl/fi/abc/file.txt?rlkey=xyz&st=q",
+                "https://dl.dropboxusercontent.com/scl/fi/abc/file.txt?rlkey=xyz&st=q&dl=1",
+            ),
+            (
+                "https://www.dropbox.com/scl/fi/abc/file.txt?rlkey=xyz&dl=0&st=q",
+                "https://dl.dropboxusercontent.com/scl/fi/abc/file.txt?rlkey=xyz&st=q&dl=1",
+            ),
+        ],
+    )
+    def test_download_url(self, url: str, expected: str) -> None:
+        """Test that dl=1 is set and other parameters are kept."""
+        assert dropbox._get_download_url(url) == expected
+
+    def test_empty_url(self) -> None:
+        """Test that an empty URL yields None."""
+        assert dropbox._get_download_url("") is None
+
+
+class TestValidateFile:
+    """Test local file validation."""
+
+    def test_returns_stat(self, tmp_path: Path) -> None:
+        """Test that the stat result is handed back for reuse."""
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"hello")
+        assert dropbox._validate_file(path).st_size == 5
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        """Test that a missing file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            dropbox._validate_file(tmp_path / "missing.txt")
+
+    def test_directory(self, tmp_path: Path) -> None:
+        """Test that a directory is rejected."""
+        with pytest.raises(ValueError, match="Not a file"):
+            dropbox._validate_file(tmp_path)
+
+
+class TestSmallFileUpload:
+    """Test single-request uploads."""
+
+    def test_sends_bytes(self, tmp_path: Path) -> None:
+        """Test that the whole file is sent as bytes, as the SDK requires."""
+        data = b"small file contents"
+        path = tmp_path / "small.txt"
+        path.write_bytes(data)
+        dbx = MagicMock()
+
+        dropbox._upload_small_file(dbx, path, "/upload/small.txt")
+
+        content = dbx.files_upload.call_args.args[0]
+        assert type(content) is bytes
+        assert content == data
+
+
+class TestShareUrl:
+    """Test share link lookup and caching."""
+
+    def test_existing_link_is_reused(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an existing link avoids the create call and is cached."""
+        monkeypatch.setattr(dropbox, "_share_url_cache", {})
+        dbx = MagicMock()
+        link = MagicMock(url="https://www.dropbox.com/s/abc/file.txt?dl=0")
+        dbx.sharing_list_shared_links.return_value.links = [link]
+
+        first = dropbox._get_share_url(dbx, "/upload/file.txt", "token", existed=True)
+        second = dropbox._get_share_url(dbx, "/upload/file.txt", "token", existed=True)
+
+        assert first == second == "https://www.dropbox.com/s/abc/file.txt?dl=1"
+        dbx.sharing_list_shared_links.assert_called_once()
+        dbx.sharing_create_shared_link_with_settings.assert_not_called()
+
+    def test_new_file_link_created_directly(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a freshly uploaded file skips the existing-link lookup."""
+        monkeypatch.setattr(dropbox, "_share_url_cache", {})
+        dbx = MagicMock()
+        dbx.sharing_create_shared_link_with_settings.return_value.url = (
+            "https://www.dropbox.com/s/new/file.txt?dl=0"
+        )
+
+        url = dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        assert url == "https://www.dropbox.com/s/new/file.txt?dl=1"
+        dbx.sharing_create_shared_link_with_settings.assert_called_once_with(
+            "/upload/file.txt"
+        )
+        dbx.sharing_list_shared_links.assert_not_called()
+        assert dropbox._share_url_cache == {}
+
+    def test_rlkey_link_gets_dl1(self) -> None:
+        """Test that dl=0 is flipped when it follows an rlkey parameter."""
+        dbx = MagicMock()
+        link = MagicMock(
+            url="https://www.dropbox.com/scl/fi/abc/file.txt?rlkey=xyz&dl=0"
+        )
+        dbx.sharing_list_shared_links.return_value.links = [link]
+        dbx.sharing_create_shared_link_with_settings.return_value = link
+
+        existing = dropbox._get_share_url(dbx, "/upload/file.txt", existed=True)
+        created = dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        assert (
+            existing
+            == created
+            == "https://www.dropbox.com/scl/fi/abc/file.txt?rlkey=xyz&dl=1"
+        )
+
+    def test_cached_link_ignored_for_new_file(
+        self, tmp_path: Path, client: dropbox.DropboxClient
+    ) -> None:
+        """Test that a stale cached link is not returned for a re-created file."""
+        path = tmp_path / "x.txt"
+        path.write_bytes(b"data")
+        dropbox._share_url_cache[("token", "/upload/x.txt")] = (
+            "https://www.dropbox.com/s/OLD/x.txt?dl=1"
+        )
+        error = MagicMock()
+        error.is_path.return_value = True
+        error.get_path.return_value.is_not_found.return_value = True
+        client.dbx.files_get_metadata.side_effect = ApiError(
+            "request-id", error, None, None
+        )
+        client.dbx.sharing_list_shared_links.return_value.links = []
+        client.dbx.sharing_create_shared_link_with_settings.return_value.url = (
+            "https://www.dropbox.com/s/NEW/x.txt?dl=0"
+        )
+
+        result = client.upload_file(path)
+
+        assert result.url == "https://www.dropbox.com/s/NEW/x.txt?dl=1"
+        assert dropbox._share_url_cache[("token", "/upload/x.txt")] == result.url
+
+    def test_link_created_when_existing_path_has_none(self) -> None:
+        """Test that a path that existed but has no link gets one created."""
+        dbx = MagicMock()
+        dbx.sharing_list_shared_links.return_value.links = []
+        dbx.sharing_create_shared_link_with_settings.return_value.url = (
+            "https://www.dropbox.com/s/new/file.txt?dl=0"
+        )
+
+        url = dropbox._get_share_url(dbx, "/upload/file.txt", existed=True)
+
+        assert url == "https://www.dropbox.com/s/new/file.txt?dl=1"
+        dbx.sharing_list_shared_links.assert_called_once()
+
+    def test_already_exists_uses_returned_link(self) -> None:
+        """Test that a create conflict reuses the link carried by the error."""
+        dbx = MagicMock()
+        link = SharedLinkMetadata(url="https://www.dropbox.com/s/old/file.txt?dl=0")
+        dbx.sharing_create_shared_link_with_settings.side_effect = ApiError(
+            "request-id",
+            CreateSharedLinkWithSettingsError.shared_link_already_exists(
+                SharedLinkAlreadyExistsMetadata.metadata(link)
+            ),
+            None,
+            None,
+        )
+
+        url = dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        assert url == "https://www.dropbox.com/s/old/file.txt?dl=1"
+        dbx.sharing_list_shared_links.assert_not_called()
+
+    def test_already_exists_without_link_falls_back_to_listing(self) -> None:
+        """Test that a create conflict without link metadata lists the links."""
+        dbx = MagicMock()
+        dbx.sharing_create_shared_link_with_settings.side_effect = ApiError(
+            "request-id",
+            CreateSharedLinkWithSettingsError.shared_link_already_exists(None),
+            None,
+            None,
+        )
+        link = MagicMock(url="https://www.dropbox.com/s/old/file.txt?dl=0")
+        dbx.sharing_list_shared_links.return_value.links = [link]
+
+        url = dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        assert url == "https://www.dropbox.com/s/old/file.txt?dl=1"
+        dbx.sharing_list_shared_links.assert_called_once()
+
+    def test_transient_failure_is_retried(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a transient error is retried with backoff."""
+        sleeps: list[float] = []
+        monkeypatch.setattr(dropbox.time, "sleep", sleeps.append)
+        dbx = MagicMock()
+        dbx.sharing_create_shared_link_with_settings.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            MagicMock(url="https://www.dropbox.com/s/a/f?dl=0"),
+        ]
+
+        url = dropbox._get_share_url(dbx, "/upload/f")
+
+        assert url == "https://www.dropbox.com/s/a/f?dl=1"
+        assert sleeps == [dropbox.SHARE_URL_RETRY_WAIT]
+
+    def test_server_error_left_to_sdk(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that errors the SDK already retried are not retried again."""
+        monkeypatch.setattr(dropbox.time, "sleep", pytest.fail)
+        dbx = MagicMock()
+        dbx.sharing_create_shared_link_with_settings.side_effect = InternalServerError(
+            "request-id", 500, "Internal Server Error"
+        )
+
+        with pytest.raises(dropbox.DropboxUploadError):
+            dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        dbx.sharing_create_shared_link_with_settings.assert_called_once()
+
+    def test_path_error_is_not_retried(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a path error fails immediately."""
+        monkeypatch.setattr(dropbox.time, "sleep", pytest.fail)
+        dbx = MagicMock()
+        error = MagicMock()
+        error.is_path.return_value = True
+        dbx.sharing_list_shared_links.side_effect = ApiError(
+            "request-id", error, None, None
+        )
+
+        with pytest.raises(dropbox.DropboxUploadError):
+            dropbox._get_share_url(dbx, "/upload/missing", existed=True)
+
+        dbx.sharing_list_shared_links.assert_called_once()
+
+    def test_other_api_error_is_not_retried(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a non-path route error fails immediately."""
+        monkeypatch.setattr(dropbox.time, "sleep", pytest.fail)
+        dbx = MagicMock()
+        dbx.sharing_create_shared_link_with_settings.side_effect = ApiError(
+            "request-id",
+            CreateSharedLinkWithSettingsError.email_not_verified,
+            None,
+            None,
+        )
+
+        with pytest.raises(dropbox.DropboxUploadError):
+            dropbox._get_share_url(dbx, "/upload/file.txt")
+
+        dbx.sharing_create_shared_link_with_settings.assert_called_once()
+
+
+class TestExistingFile:
+    """Test uploads that hit an existing remote file."""
+
+    def test_existing_file_reports_url(
+        self, tmp_path: Path, client: dropbox.DropboxClient
+    ) -> None:
+        """Test that the existing share URL is attached without uploading."""
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"data")
+        link = MagicMock(url="https://www.dropbox.com/s/abc/file.txt?dl=0")
+        client.dbx.sharing_list_shared_links.return_value.links = [link]
+
+        with pytest.raises(dropbox.DropboxFileExistsError) as exc_info:
+            client.upload_file(path)
+
+        assert exc_info.value.url == "https://www.dropbox.com/s/abc/file.txt?dl=1"
+        client.dbx.files_upload.assert_not_called()
+
+    def test_new_file_lists_links_once(
+        self, tmp_path: Path, client: dropbox.DropboxClient
+    ) -> None:
+        """Test that the link lookup is not repeated after uploading a new file."""
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"data")
+        error = MagicMock()
+        error.is_path.return_value = True
+        error.get_path.return_value.is_not_found.return_value = True
+        client.dbx.files_get_metadata.side_effect = ApiError(
+            "request-id", error, None, None
+        )
+        client.dbx.sharing_list_shared_links.return_value.links = []
+        client.dbx.sharing_create_shared_link_with_settings.return_value.url = (
+            "https://www.dropbox.com/s/new/file.txt?dl=0"
+        )
+
+        result = client.upload_file(path)
+
+        assert result.url == "https://www.dropbox.com/s/new/file.txt?dl=1"
+        client.dbx.sharing_list_shared_links.assert_called_once()
+        client.dbx.files_upload.assert_called_once()
+
+    def test_unique_upload_skips_link_lookup(
+        self, tmp_path: Path, client: dropbox.DropboxClient
+    ) -> None:
+        """Test that a timestamped upload does not look for an existing link."""
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"data")
+        error = MagicMock()
+        error.is_path.return_value = True
+        error.get_path.return_value.is_not_found.return_value = True
+        client.dbx.files_get_metadata.side_effect = ApiError(
+            "request-id", error, None, None
+        )
+        client.dbx.sharing_create_shared_link_with_settings.return_value.url = (
+            "https://www.dropbox.com/s/new/file.txt?dl=0"
+        )
+
+        client.upload_file(path, unique=True)
+
+        client.dbx.sharing_list_shared_links.assert_not_called()
+        client.dbx.files_upload.assert_called_once()
+
+
+class TestContentHash:
+    """Test the local Dropbox content hash."""
+
+    @pytest.mark.parametrize("size", [0, 5, 4 * 1024 * 1024, 4 * 1024 * 1024 + 1])
+    def test_matches_dropbox_algorithm(self, tmp_path: Path, size: int) -> None:
+        """Test the hash against a straightforward block-wise reference."""
+        data = bytes(i % 253 for i in range(size))
+        path = tmp_path / "file.bin"
+        path.write_bytes(data)
+        block = 4 * 1024 * 1024
+        digests = b"".join(
+            hashlib.sha256(data[i : i + block]).digest()
+            for i in range(0, len(data), block)
+        )
+
+        assert (
+            dropbox._dropbox_content_hash(path) == hashlib.sha256(digests).hexdigest()
+        )
+
+    def test_forced_upload_of_identical_file_is_skipped(
+        self, tmp_path: Path, client: dropbox.DropboxClient
+    ) -> None:
+        """Test that force=True does not re-send unchanged content."""
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"unchanged")
+        metadata = client.dbx.files_get_metadata.return_value
+        metadata.size = path.stat().st_size
+        metadata.content_hash = dropbox._dropbox_content_hash(path)
+        link = MagicMock(url="https://www.dropbox.com/s/abc/file.txt?dl=0")
+        client.dbx.sharing_list_shared_links.return_value.links = [link]
+
+        client.upload_file(path, force=True)
+
+        client.dbx.files_upload.assert_not_called()
+        client.dbx.files_upload_session_start.assert_not_called()
+
+
+class TestUploadProgress:
+    """Test chunked upload progress reporting."""
+
+    def test_progress_logged_in_ten_percent_steps(
+        self, tmp_path: Path, mock_dbx: MagicMock
+    ) -> None:
+        """Test that progress is reported once per 10% step, not per chunk."""
+        path = tmp_path / "large.bin"
+        path.write_bytes(b"x" * CHUNK * 40)
+        messages: list[str] = []
+        handler = logger.add(messages.append, level="DEBUG", format="{message}")
+        try:
+            dropbox._upload_large_file(mock_dbx, path, "/upload/large.bin", CHUNK)
+        finally:
+            logger.remove(handler)
+
+        progress = [m.strip() for m in messages if m.startswith("Uploaded ")]
+        assert progress == [
+            f"Uploaded {p}% of /upload/large.bin" for p in range(10, 100, 10)
+        ]
@@ -7,3 +7,49 @@ def test_version():
     import twat_fs
 
     assert twat_fs.__version__
+
+
+def test_cli_provider_parsing():
+    """Verify repeated and comma-separated --provider values are flattened."""
+    from twat_fs.cli import _build_parser, _parse_providers
+
+    args = _build_parser().parse_args(
+        ["upload_file", "f.txt", "--provider", "s3,dropbox", "--provider", "[catbox]"]
+    )
+    assert args.file_path == "f.txt"
+    assert _parse_providers(args.provider) == ["s3", "dropbox", "catbox"]
+    assert _parse_providers(None) is None
+
+
+def test_cli_does_not_import_providers():
+    """Verify importing the CLI leaves upload providers unloaded."""
+    import subprocess
+    import sys
+
+    code = "import sys, twat_fs.cli; print('twat_fs.upload' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_upload_module_loads_providers_lazily():
+    """Verify provider modules are imported only when a provider is selected."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from twat_fs.upload_providers import get_provider_module\n"
+        "import twat_fs.upload\n"
+        "get_provider_module('catbox')\n"
+        "print(sorted(m.rsplit('.', 1)[1] for m in sys.modules\n"
+        "             if m.startswith('twat_fs.upload_providers.')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    loaded = result.stdout.strip()
+    assert "catbox" in loaded
+    assert "dropbox" not in loaded
+    assert "s3" not in loaded